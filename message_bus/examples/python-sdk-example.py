@@ -7,24 +7,334 @@ to interact with the KMP Supply Chain API.
 
 ⚠️ PREREQUISITE: Generate the Python SDK first:
    npm run generate:sdks
-   or manually: openapi-generator generate -i http://localhost:4000/openapi.json -g python -o ./generated-sdks/python
+   or manually: openapi-generator generate -i http://localhost:4000/openapi.json -g python -o ./generated-sdks/python \
+                --additional-properties=library=asyncio
 
 📦 Installation (after SDK generation):
    cd generated-sdks/python
    pip install -e .
+   pip install msgspec cachetools brotli
+   pip install uvloop  # optional, faster event loop (Linux/macOS)
 """
 
 import json
 import asyncio
-from typing import Optional, Dict, Any
+import base64
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 
-# NOTE: Imports will work after SDK generation
-# import kmp_supply_chain
-# from kmp_supply_chain.api import default_api
-# from kmp_supply_chain.model.supply_chain_event import SupplyChainEvent
-# from kmp_supply_chain.model.user_registration import UserRegistration
-# from kmp_supply_chain.model.user_login import UserLogin
-# from kmp_supply_chain.model.api_key_create import ApiKeyCreate
+import msgspec
+from cachetools import LRUCache, TTLCache
+
+# NOTE: The generated SDK (kmp_supply_chain) is imported lazily in
+# KMPSupplyChainClient.__init__, so importing this module or running a
+# short-lived command doesn't pay for loading the whole SDK package.
+
+
+# 📨 Request/response payloads
+# Write-path bodies are msgspec structs encoded straight to JSON bytes rather
+# than generated SDK models, which validate every field through __setattr__
+# and are serialized via json.dumps. Field names are camelCased on the wire.
+
+class UserRegistration(msgspec.Struct, rename="camel", omit_defaults=True):
+    email: str
+    password: str
+    first_name: str
+    last_name: str
+    company_id: Optional[int] = None
+
+
+class UserLogin(msgspec.Struct, rename="camel"):
+    email: str
+    password: str
+
+
+class ApiKeyCreate(msgspec.Struct, rename="camel", omit_defaults=True):
+    name: str
+    scopes: List[str]
+    expires_at: Optional[str] = None
+
+
+class SupplyChainEvent(msgspec.Struct, rename="camel", omit_defaults=True):
+    product_id: str
+    location: str
+    event_type: str
+    batch_id: Optional[str] = None
+    # None rather than {} so events without metadata allocate nothing and
+    # the field is simply omitted on the wire
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class AuthResponse(msgspec.Struct, rename="camel"):
+    message: Optional[str] = None
+    user: Optional[Dict[str, Any]] = None
+    token: Optional[str] = None
+    expires_at: Optional[str] = None
+
+
+class ApiKeyResponse(msgspec.Struct, rename="camel"):
+    id: Optional[int] = None
+    name: Optional[str] = None
+    key: Optional[str] = None
+    key_prefix: Optional[str] = None
+    scopes: List[str] = []
+
+
+class SupplyChainEventResponse(msgspec.Struct, rename="camel"):
+    success: bool = False
+    message: Optional[str] = None
+    transaction_id: Optional[str] = None
+    blockchain_explorer: Optional[str] = None
+    event_id: Optional[int] = None
+    payload_handling: Optional[Dict[str, Any]] = None
+    fees: Optional[Dict[str, Any]] = None
+
+
+_json_encoder = msgspec.json.Encoder()
+
+
+@functools.lru_cache(maxsize=None)
+def _json_decoder(response_type: type) -> msgspec.json.Decoder:
+    """
+    🧩 Typed decoder for a response struct, built once per type
+    
+    Validation plans are compiled when the decoder is created, so reusing
+    it keeps per-response work down to the C-level parse itself.
+    """
+    return msgspec.json.Decoder(response_type)
+
+
+class _FastJSON:
+    """
+    ⚡ Drop-in for the ``json`` module as seen by the generated SDK
+    
+    ``loads`` is msgspec's C decoder (it raises a ValueError subclass, like
+    the stdlib); everything else falls through to the stdlib module.
+    """
+    
+    loads = staticmethod(msgspec.json.decode)
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+def _install_fast_json(api_client_module):
+    """
+    ⚡ Make the generated SDK parse responses with msgspec
+    
+    Only the SDK module's ``json`` reference is swapped; the stdlib module
+    itself is left untouched for the rest of the process.
+    """
+    api_client_module.json = _FastJSON()
+
+logger = logging.getLogger("kmp_supply_chain.example")
+
+
+
+class _BufferedStdoutHandler(logging.Handler):
+    """
+    🧾 Logging handler that batches records into few write syscalls
+    
+    Formatted records are accumulated in a bytearray and written to stdout
+    with os.write() instead of a locked, flushed write per line. The buffer
+    is written out at most ``_LOG_FLUSH_INTERVAL`` seconds after the first
+    buffered record (immediately when no event loop is running), right away
+    for WARNING and above, and on explicit flush()/interpreter exit.
+    """
+    
+    def __init__(self, fd: int = 1):
+        super().__init__()
+        self._fd = fd
+        self._buffer = bytearray()
+        # Loop whose call_later timer will flush the buffer, if any. A timer
+        # dies with its loop, so a different running loop schedules its own.
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._buffer += (self.format(record) + "\n").encode()
+        except Exception:
+            self.handleError(record)
+            return
+
+        if record.levelno >= logging.WARNING:
+            self.flush()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # Synchronous caller: nothing would flush it later
+            return
+        if self._flush_loop is not loop:
+            self._flush_loop = loop
+            loop.call_later(_LOG_FLUSH_INTERVAL, self.flush)
+
+    def flush(self):
+        # Written under the lock so concurrent flushes can't interleave or
+        # reorder lines
+        self.acquire()
+        try:
+            self._flush_loop = None
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            while data:
+                data = data[os.write(self._fd, data):]
+        finally:
+            self.release()
+
+
+_LOG_FLUSH_INTERVAL = 0.1
+_log_sink = _BufferedStdoutHandler()
+
+_HASH_PREFIX_LEN = 16
+
+# Read-only endpoints polled by dashboards are served from a short-lived
+# cache instead of hitting the API on every refresh
+_TRACE_CACHE_TTL = 2.0
+_HEALTH_CACHE_TTL = 10.0
+
+# Logins are saved here and reused by later runs until shortly before expiry
+_TOKEN_PATH = Path.home() / ".kmp" / "token.json"
+_TOKEN_REFRESH_MARGIN = 30.0
+
+# Upper bound on pooled connections to the API. aiohttp negotiates response
+# compression itself (gzip/deflate, plus br when the brotli package is
+# installed), so trace/dashboard payloads are compressed whenever the API or
+# its ingress supports it.
+_MAX_CONNECTIONS = 100
+
+# Per-thread home of KMPSupplyChainClient.shared()
+_thread_local = threading.local()
+
+# Transient failures (throttling, gateway errors, dropped connections) are
+# retried with exponential backoff and full jitter
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Statuses where the API rejected the request without processing it, the
+# only failures a non-idempotent POST may be retried after
+_RETRY_UNPROCESSED_STATUSES = frozenset({429, 503})
+_RETRY_ATTEMPTS = 5
+_RETRY_BACKOFF = 0.2
+_RETRY_MAX_DELAY = 10.0
+
+
+def _jwt_expiry(token: str) -> float:
+    """
+    ⏳ Read the ``exp`` claim of a JWT without verifying its signature
+    
+    Returns 0.0 (already expired) for tokens that can't be decoded.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(msgspec.json.decode(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return 0.0
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_hash(transaction_hash: str) -> str:
+    """
+    ✂️ Abbreviate a transaction hash for display
+    
+    Cached, since monitoring loops poll the same hashes repeatedly.
+    """
+    if len(transaction_hash) > _HASH_PREFIX_LEN:
+        return transaction_hash[:_HASH_PREFIX_LEN] + "..."
+    return transaction_hash
+
+
+def _was_unprocessed(error: BaseException) -> bool:
+    """
+    🚫 Whether a failed request is known never to have been processed
+    
+    True for 429/503 responses and for connections that were refused before
+    anything was sent (aiohttp's ClientConnectorError carries the underlying
+    OSError as ``os_error``).
+    """
+    status = getattr(error, "status", None)
+    if status is not None:
+        return status in _RETRY_UNPROCESSED_STATUSES
+    return isinstance(getattr(error, "os_error", error), ConnectionRefusedError)
+
+
+async def _with_retries(request, idempotent: bool = True):
+    """
+    🔁 Await ``request()``, retrying transient failures
+    
+    Idempotent requests (GETs) are retried after connection errors,
+    timeouts and 429/5xx responses (SDK ApiException and aiohttp
+    ClientResponseError both carry ``status`` and ``headers``). Anything
+    else may already have been applied by the server when it failed, so it
+    is only retried when it never reached the API (see _was_unprocessed).
+    A numeric Retry-After from the API takes precedence over the computed
+    backoff when it is longer.
+    """
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            return await request()
+        except Exception as error:
+            if not idempotent:
+                retryable = _was_unprocessed(error)
+            elif getattr(error, "status", None) is not None:
+                retryable = error.status in _RETRY_STATUSES
+            else:
+                retryable = isinstance(error, (OSError, asyncio.TimeoutError))
+            if not retryable or attempt == _RETRY_ATTEMPTS - 1:
+                raise
+
+            delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BACKOFF * 2 ** attempt))
+            retry_after = (getattr(error, "headers", None) or {}).get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+
+            logger.warning("🔁 Retrying in %.2fs after: %s", delay, error)
+            await asyncio.sleep(delay)
+
+
+def _format_trace_events(events) -> str:
+    """
+    📜 Render a product's event history as one block of text
+    
+    Built with a single join so a long trace is one log record (and one
+    write) rather than two per event.
+    """
+    return "\n".join([
+        "  %d. %s at %s (%s)\n     Status: %s, TX: %s" % (
+            i, event.event_type, event.location, event.timestamp, event.status,
+            _short_hash(event.transaction_hash) if event.transaction_hash else "N/A"
+        )
+        for i, event in enumerate(events, 1)
+    ])
+
+
+def _api_call(name: str):
+    """
+    📋 Log the outcome of an API call
+    
+    Success is logged at DEBUG; failures are logged with traceback and
+    re-raised. Messages use lazy %-formatting, so nothing is formatted
+    unless the level is enabled. The client's JWT is checked for expiry
+    before every call.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(client, *args, **kwargs):
+            client._ensure_token()
+            try:
+                result = await fn(client, *args, **kwargs)
+            except Exception:
+                logger.exception("❌ %s failed", name)
+                raise
+            logger.debug("%s ok", name)
+            return result
+        return wrapper
+    return decorator
 
 
 class KMPSupplyChainClient:
@@ -32,11 +342,28 @@ class KMPSupplyChainClient:
     🚀 KMP Supply Chain API Python Client
     
     A high-level wrapper around the generated Python SDK for easier usage.
+    All API methods are coroutines (the SDK is generated with the asyncio
+    library), so independent calls can be issued concurrently with
+    ``asyncio.gather``. Use the client as an async context manager so the
+    underlying HTTP session is closed and queued events are flushed on exit.
     """
     
+    # Fixed attribute layout: per-event attribute lookups in the batched
+    # submit path hit slot descriptors instead of an instance __dict__.
+    __slots__ = (
+        "base_url", "api_key", "jwt_token",
+        "configuration", "api_client", "api_instance",
+        "_headers", "_event_queue", "_batch_size", "_flush_interval", "_flush_task",
+        "_inflight_batches", "failed_events",
+        "_trace_cache", "_trace_etags", "_health_cache", "_token_email", "_token_exp",
+        "_get_trace", "_get_dashboard", "_get_transaction_status", "_get_health",
+    )
+    
     def __init__(self, base_url: str = "http://localhost:4000", 
                  api_key: Optional[str] = None, 
-                 jwt_token: Optional[str] = None):
+                 jwt_token: Optional[str] = None,
+                 batch_size: int = 50,
+                 flush_interval: float = 5.0):
         """
         Initialize the KMP Supply Chain client.
         
@@ -44,24 +371,217 @@ class KMPSupplyChainClient:
             base_url: API base URL
             api_key: API key for authentication
             jwt_token: JWT token for authentication
+            batch_size: Number of queued events that triggers a flush
+            flush_interval: Seconds between background flushes of queued events
         """
         # NOTE: This will work after SDK generation
-        # configuration = kmp_supply_chain.Configuration(
+        # import kmp_supply_chain
+        # from kmp_supply_chain.api import default_api
+        # from kmp_supply_chain.exceptions import ApiException
+        #
+        # A single Configuration/ApiClient pair is kept for the lifetime of the
+        # client so every call shares one aiohttp connection pool (keep-alive,
+        # TLS session reuse). Token changes mutate the configuration in place.
+        # self.configuration = kmp_supply_chain.Configuration(
         #     host=base_url,
         #     api_key={'X-API-Key': api_key} if api_key else {},
         #     access_token=jwt_token
         # )
+        # self.configuration.connection_pool_maxsize = _MAX_CONNECTIONS
         # 
-        # self.api_client = kmp_supply_chain.ApiClient(configuration)
+        # self.api_client = kmp_supply_chain.ApiClient(self.configuration)
         # self.api_instance = default_api.DefaultApi(self.api_client)
+        #
+        # Bind the GET endpoints once; polling loops then skip the attribute
+        # lookups through api_instance on every call
+        # self._get_trace = self.api_instance.api_product_product_id_trace_get_with_http_info
+        # self._get_dashboard = self.api_instance.api_company_company_id_dashboard_get
+        # self._get_transaction_status = self.api_instance.api_transaction_transaction_hash_status_get
+        # self._get_health = self.api_instance.health_get
+        #
+        # Trace and dashboard responses can carry hundreds of events, so the
+        # SDK's response decoding is pointed at msgspec as well
+        # _install_fast_json(kmp_supply_chain.api_client)
         
         self.base_url = base_url
         self.api_key = api_key
         self.jwt_token = jwt_token
-        print(f"🚀 Initialized KMP Supply Chain client for {base_url}")
 
-    def register_user(self, email: str, password: str, first_name: str, 
-                     last_name: str, company_id: Optional[int] = None):
+        self._headers = {"Content-Type": "application/json"}
+        if api_key:
+            self._headers["X-API-Key"] = api_key
+
+        self._token_email: Optional[str] = None
+        self._token_exp = 0.0
+        if jwt_token:
+            self._update_token(jwt_token)
+        else:
+            self._load_token()
+
+        self._event_queue: List[Dict[str, Any]] = []
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._flush_task: Optional[asyncio.Task] = None
+        self._inflight_batches: set = set()
+        # Events that failed in a way that makes resubmitting them unsafe or
+        # pointless, paired with the error; left for the caller to inspect
+        self.failed_events: List[Tuple[Dict[str, Any], BaseException]] = []
+
+        self._trace_cache = TTLCache(maxsize=10_000, ttl=_TRACE_CACHE_TTL)
+        # (ETag, response) per trace page, outliving the TTL cache so expired
+        # pages are revalidated rather than refetched
+        self._trace_etags = LRUCache(maxsize=10_000)
+        self._health_cache = TTLCache(maxsize=1, ttl=_HEALTH_CACHE_TTL)
+        logger.info("🚀 Initialized KMP Supply Chain client for %s", base_url)
+
+    @classmethod
+    def shared(cls, **kwargs) -> "KMPSupplyChainClient":
+        """
+        🧵 Get the client shared by all code running on the current thread
+        
+        Created lazily from ``kwargs`` on first use; later calls on the same
+        thread return that instance and ignore ``kwargs``. aiohttp sessions
+        are bound to the event loop that created them, so each worker thread
+        (with its own loop) gets its own client and connection pool, while
+        logins are still shared through the saved token file.
+        """
+        client = getattr(_thread_local, "client", None)
+        if client is None:
+            client = _thread_local.client = cls(**kwargs)
+        return client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        🔌 Flush queued events and close the underlying HTTP session
+        """
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        # Batches already taken off the queue keep running (they are shielded
+        # from the cancellation above); let them finish, events they requeue
+        # are picked up by the final flush
+        if self._inflight_batches:
+            await asyncio.gather(*self._inflight_batches, return_exceptions=True)
+        await self.flush()
+        # await self.api_client.close()
+
+    async def queue_supply_chain_event(self, product_id: str, location: str,
+                                       event_type: str, batch_id: Optional[str] = None,
+                                       metadata: Optional[Dict[str, Any]] = None):
+        """
+        📥 Queue a supply chain event for batched submission
+        
+        Events are flushed once ``batch_size`` of them are queued, every
+        ``flush_interval`` seconds in the background, and on ``close()``.
+        
+        Args:
+            product_id: Unique identifier for the product
+            location: Location where event occurred
+            event_type: Type of supply chain event
+            batch_id: Optional batch identifier
+            metadata: Additional event-specific data
+            
+        Returns:
+            Submission responses if this event triggered a flush, else None
+        """
+        self._event_queue.append({
+            "product_id": product_id,
+            "location": location,
+            "event_type": event_type,
+            "batch_id": batch_id,
+            "metadata": metadata
+        })
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+        if len(self._event_queue) >= self._batch_size:
+            return await self.flush()
+        return None
+
+    async def flush(self):
+        """
+        🚚 Submit all queued supply chain events
+        
+        The API has no bulk endpoint, so queued events are submitted
+        concurrently over the shared connection pool. Events the API turned
+        away unprocessed (429/503, refused connection) go back on the queue
+        for the next flush; any other failure may already have been applied,
+        or will never succeed, so those events move to ``failed_events``
+        instead of being resubmitted.
+        
+        Returns:
+            List of event submission responses, in queue order
+        
+        Raises:
+            The first submission error, once every failed event is requeued
+            or recorded in ``failed_events``
+        """
+        try:
+            if not self._event_queue:
+                return []
+
+            events, self._event_queue = self._event_queue, []
+            logger.info("🚚 Flushing %d queued events...", len(events))
+            # Shielded so cancelling a flush (e.g. close() stopping the
+            # background task) can't drop events already taken off the queue
+            batch = asyncio.ensure_future(self._submit_batch(events))
+            self._inflight_batches.add(batch)
+            batch.add_done_callback(self._inflight_batches.discard)
+            return await asyncio.shield(batch)
+        finally:
+            # Write out everything logged for this batch in one go
+            _log_sink.flush()
+
+    async def _submit_batch(self, events: List[Dict[str, Any]]):
+        """
+        📦 Submit one batch of dequeued events, requeueing any left unprocessed
+        """
+        results = await asyncio.gather(
+            *(self.submit_supply_chain_event(**event) for event in events),
+            return_exceptions=True
+        )
+        requeue = []
+        dropped = 0
+        first_error = None
+        for event, result in zip(events, results):
+            if not isinstance(result, BaseException):
+                continue
+            first_error = first_error or result
+            if _was_unprocessed(result):
+                requeue.append(event)
+            else:
+                self.failed_events.append((event, result))
+                dropped += 1
+        if first_error is None:
+            return results
+
+        # Ahead of anything queued meanwhile, so submission order holds
+        self._event_queue[:0] = requeue
+        logger.warning("⚠️ %d of %d events failed: %d requeued, %d moved to failed_events",
+                       len(requeue) + dropped, len(events), len(requeue), dropped)
+        raise first_error
+
+    async def _flush_periodically(self):
+        """
+        ⏱️ Background task flushing the event queue every ``flush_interval``
+        """
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("❌ Background flush failed")
+
+    @_api_call("Registration")
+    async def register_user(self, email: str, password: str, first_name: str, 
+                           last_name: str, company_id: Optional[int] = None):
         """
         📝 Register a new user
         
@@ -75,25 +595,21 @@ class KMPSupplyChainClient:
         Returns:
             Registration response with user details and JWT token
         """
-        try:
-            # user_data = UserRegistration(
-            #     email=email,
-            #     password=password,
-            #     first_name=first_name,
-            #     last_name=last_name,
-            #     company_id=company_id
-            # )
-            # 
-            # response = self.api_instance.api_auth_register_post(user_data)
-            
-            print(f"✅ User registered successfully: {email}")
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Registration failed: {error}")
-            raise error
+        user_data = UserRegistration(
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name,
+            company_id=company_id
+        )
+        
+        # response = await self._post("/api/auth/register", user_data, AuthResponse)
+        
+        logger.info("✅ User registered successfully: %s", email)
+        # return response
 
-    def login_user(self, email: str, password: str):
+    @_api_call("Login")
+    async def login_user(self, email: str, password: str):
         """
         🔑 Login user and get JWT token
         
@@ -102,26 +618,27 @@ class KMPSupplyChainClient:
             password: User's password
             
         Returns:
-            Login response with JWT token
+            Login response with JWT token; a still-valid saved login for the
+            same user is reused without a round trip
         """
-        try:
-            # credentials = UserLogin(email=email, password=password)
-            # response = self.api_instance.api_auth_login_post(credentials)
-            
-            print("✅ Login successful")
-            # print(f"🎫 JWT Token: {response.token}")
-            
-            # Update the client with the new token
-            # self.jwt_token = response.token
-            # self._update_token(response.token)
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Login failed: {error}")
-            raise error
+        if self._token_email == email and not self._needs_refresh():
+            logger.info("✅ Reusing saved login for %s", email)
+            return AuthResponse(token=self.jwt_token)
+
+        credentials = UserLogin(email=email, password=password)
+        # response = await self._post("/api/auth/login", credentials, AuthResponse)
+        
+        logger.info("✅ Login successful")
+        # logger.info("🎫 JWT Token: %s", response.token)
+        
+        # Update the client with the new token and save it for later runs
+        # self._update_token(response.token)
+        # self._save_token(email)
+        
+        # return response
 
-    def create_api_key(self, name: str, scopes: list, expires_at: Optional[str] = None):
+    @_api_call("API key creation")
+    async def create_api_key(self, name: str, scopes: list, expires_at: Optional[str] = None):
         """
         🔧 Create API key for programmatic access
         
@@ -133,28 +650,24 @@ class KMPSupplyChainClient:
         Returns:
             API key response with generated key
         """
-        try:
-            # key_data = ApiKeyCreate(
-            #     name=name,
-            #     scopes=scopes,
-            #     expires_at=expires_at
-            # )
-            # 
-            # response = self.api_instance.api_auth_api_keys_post(key_data)
-            
-            print("✅ API Key created successfully")
-            # print(f"🔑 Key: {response.key}")
-            # print(f"🏷️ Prefix: {response.key_prefix}")
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ API Key creation failed: {error}")
-            raise error
+        key_data = ApiKeyCreate(
+            name=name,
+            scopes=scopes,
+            expires_at=expires_at
+        )
+        
+        # response = await self._post("/api/auth/api-keys", key_data, ApiKeyResponse)
+        
+        logger.info("✅ API Key created successfully")
+        # logger.info("🔑 Key: %s", response.key)
+        # logger.info("🏷️ Prefix: %s", response.key_prefix)
+        
+        # return response
 
-    def submit_supply_chain_event(self, product_id: str, location: str, 
-                                event_type: str, batch_id: Optional[str] = None,
-                                metadata: Optional[Dict[str, Any]] = None):
+    @_api_call("Event submission")
+    async def submit_supply_chain_event(self, product_id: str, location: str, 
+                                      event_type: str, batch_id: Optional[str] = None,
+                                      metadata: Optional[Dict[str, Any]] = None):
         """
         📦 Submit supply chain event
         
@@ -168,58 +681,80 @@ class KMPSupplyChainClient:
         Returns:
             Event submission response with transaction details
         """
-        try:
-            # event_data = SupplyChainEvent(
-            #     product_id=product_id,
-            #     location=location,
-            #     event_type=event_type,
-            #     batch_id=batch_id,
-            #     metadata=metadata or {}
-            # )
-            # 
-            # response = self.api_instance.api_supply_chain_event_post(event_data)
-            
-            print("✅ Supply chain event submitted successfully!")
-            # print(f"📋 Transaction ID: {response.transaction_id}")
-            # print(f"🌐 Explorer Link: {response.blockchain_explorer}")
-            # print(f"💰 Fee Info: {response.fees}")
-            # print(f"📊 Payload Handling: {response.payload_handling}")
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Event submission failed: {error}")
-            raise error
+        event_data = SupplyChainEvent(
+            product_id=product_id,
+            location=location,
+            event_type=event_type,
+            batch_id=batch_id,
+            metadata=metadata
+        )
+        
+        # response = await self._post(
+        #     "/api/supply-chain/event", event_data, SupplyChainEventResponse
+        # )
+        
+        logger.info("✅ Supply chain event submitted successfully!")
+        # logger.info("📋 Transaction ID: %s", response.transaction_id)
+        # logger.info("🌐 Explorer Link: %s", response.blockchain_explorer)
+        # logger.info("💰 Fee Info: %s", response.fees)
+        # logger.info("📊 Payload Handling: %s", response.payload_handling)
+        
+        # return response
 
-    def get_product_trace(self, product_id: str):
+    @_api_call("Product trace")
+    async def get_product_trace(self, product_id: str, limit: Optional[int] = None,
+                                since: Optional[str] = None):
         """
         🔍 Get product traceability
         
         Args:
             product_id: Product identifier to trace
+            limit: Only fetch the newest N events (server caps this at 1000)
+            since: Only fetch events recorded after this ISO-8601 timestamp
             
         Returns:
-            Product traceability response with event history
+            Product traceability response with event history (cached for
+            a couple of seconds per product and page, then revalidated with
+            the page's ETag)
         """
-        try:
-            # response = self.api_instance.api_product_product_id_trace_get(product_id)
-            
-            print(f"🔍 Traceability for product {product_id}:")
-            # print(f"📊 Total events: {response.total_events}")
-            
-            # if response.events:
-            #     for i, event in enumerate(response.events, 1):
-            #         print(f"  {i}. {event.event_type} at {event.location} ({event.timestamp})")
-            #         tx_short = event.transaction_hash[:16] + "..." if event.transaction_hash else "N/A"
-            #         print(f"     Status: {event.status}, TX: {tx_short}")
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Failed to get product trace: {error}")
-            raise error
+        # Dashboards usually need only the latest events, and incremental
+        # pollers only what is new; bounding the page keeps the response
+        # (and its decoded event list) small instead of the full history
+        # key = (product_id, limit, since)
+        # response = self._trace_cache.get(key)
+        # if response is None:
+        #     etag, stale = self._trace_etags.get(key, (None, None))
+        #
+        #     async def fetch():
+        #         try:
+        #             return await self._get_trace(
+        #                 product_id, limit=limit, since=since,
+        #                 _headers={"If-None-Match": etag} if etag else None
+        #             )
+        #         except ApiException as error:
+        #             if error.status == 304:
+        #                 return None  # Unchanged: reuse the stored page
+        #             raise
+        #
+        #     result = await _with_retries(fetch)
+        #     if result is None:
+        #         response = stale
+        #     else:
+        #         response = result.data
+        #         if result.headers.get("ETag"):
+        #             self._trace_etags[key] = (result.headers["ETag"], response)
+        #     self._trace_cache[key] = response
+        
+        logger.info("🔍 Traceability for product %s:", product_id)
+        # logger.info("📊 Total events: %s", response.total_events)
+        
+        # if response.events and logger.isEnabledFor(logging.INFO):
+        #     logger.info("%s", _format_trace_events(response.events))
+        
+        # return response
 
-    def get_company_dashboard(self, company_id: int, days: int = 30):
+    @_api_call("Dashboard")
+    async def get_company_dashboard(self, company_id: int, days: int = 30):
         """
         📊 Get company dashboard
         
@@ -230,23 +765,30 @@ class KMPSupplyChainClient:
         Returns:
             Company dashboard with analytics
         """
-        try:
-            # response = self.api_instance.api_company_company_id_dashboard_get(
-            #     company_id, days=days
-            # )
-            
-            print(f"📊 Company {company_id} Dashboard ({days} days):")
-            # print(f"📈 Event Stats: {response.events}")
-            # print(f"💰 Transaction Stats: {response.transactions}")
-            # print(f"📝 Recent Events: {len(response.recent_events) if response.recent_events else 0}")
-            
-            # return response
+        # response = await _with_retries(lambda: self._get_dashboard(company_id, days=days))
+        
+        logger.info("📊 Company %s Dashboard (%d days):", company_id, days)
+        # logger.info("📈 Event Stats: %s", response.events)
+        # logger.info("💰 Transaction Stats: %s", response.transactions)
+        # logger.info("📝 Recent Events: %d", len(response.recent_events) if response.recent_events else 0)
+        
+        # return response
+
+    def dashboard_for(self, company_id: int, days: int = 30):
+        """
+        📊 Bind a dashboard poller for one company
+        
+        Args:
+            company_id: Company ID
+            days: Number of days to include in statistics
             
-        except Exception as error:
-            print(f"❌ Failed to get dashboard: {error}")
-            raise error
+        Returns:
+            Zero-argument coroutine function fetching that dashboard
+        """
+        return functools.partial(self.get_company_dashboard, company_id, days=days)
 
-    def get_transaction_status(self, transaction_hash: str):
+    @_api_call("Transaction status")
+    async def get_transaction_status(self, transaction_hash: str):
         """
         🔍 Check transaction status
         
@@ -256,113 +798,212 @@ class KMPSupplyChainClient:
         Returns:
             Transaction status response
         """
-        try:
-            # response = self.api_instance.api_transaction_transaction_hash_status_get(
-            #     transaction_hash
-            # )
-            
-            tx_short = transaction_hash[:16] + "..." if len(transaction_hash) > 16 else transaction_hash
-            print(f"🔍 Transaction {tx_short} Status:")
-            # print(f"📊 Status: {response.status}")
-            # print(f"✅ Confirmations: {response.confirmations}")
-            # print(f"🏗️ Block Height: {response.block_height}")
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Failed to get transaction status: {error}")
-            raise error
+        # response = await _with_retries(lambda: self._get_transaction_status(transaction_hash))
+        
+        logger.info("🔍 Transaction %s Status:", _short_hash(transaction_hash))
+        # logger.info("📊 Status: %s", response.status)
+        # logger.info("✅ Confirmations: %s", response.confirmations)
+        # logger.info("🏗️ Block Height: %s", response.block_height)
+        
+        # return response
 
-    def get_system_health(self):
+    @_api_call("Health check")
+    async def get_system_health(self):
         """
         📊 Get system health
         
         Returns:
-            System health status
+            System health status (cached for a few seconds)
         """
-        try:
-            # response = self.api_instance.health_get()
-            
-            print("🏥 System Health Check:")
-            # print(f"📊 Status: {response.status}")
-            # print(f"🗄️ Database: {response.database}")
-            # print(f"💾 Storage: {response.storage}")
-            # print(f"🔗 Confirmations: {response.confirmations}")
-            # print(f"🌐 WebSocket: {response.websocket}")
-            
-            # return response
-            
-        except Exception as error:
-            print(f"❌ Health check failed: {error}")
-            raise error
+        # response = self._health_cache.get("health")
+        # if response is None:
+        #     response = await _with_retries(self._get_health)
+        #     self._health_cache["health"] = response
+        
+        logger.info("🏥 System Health Check:")
+        # logger.info("📊 Status: %s", response.status)
+        # logger.info("🗄️ Database: %s", response.database)
+        # logger.info("💾 Storage: %s", response.storage)
+        # logger.info("🔗 Confirmations: %s", response.confirmations)
+        # logger.info("🌐 WebSocket: %s", response.websocket)
+        
+        # return response
+
+    async def _post(self, path: str, payload: msgspec.Struct, response_type: type):
+        """
+        📤 POST a payload struct as pre-encoded JSON bytes
+        
+        Goes through the SDK's aiohttp session so the pooled connections are
+        shared with the generated endpoints, but skips its model layer.
+        """
+        body = _json_encoder.encode(payload)
+        # session = self.api_client.rest_client.pool_manager
+        #
+        # async def send():
+        #     async with session.post(self.base_url + path, data=body,
+        #                             headers=self._headers) as response:
+        #         response.raise_for_status()
+        #         return _json_decoder(response_type).decode(await response.read())
+        #
+        # # Event/auth POSTs aren't idempotent: a retry after a dropped
+        # # connection or 5xx could submit the same event twice
+        # return await _with_retries(send, idempotent=False)
 
     def _update_token(self, token: str):
         """
         🔄 Update JWT token in the API client
+        
+        Mutates the existing configuration instead of rebuilding the
+        ApiClient, so the pooled connections stay warm across refreshes.
         """
-        # configuration = kmp_supply_chain.Configuration(
-        #     host=self.base_url,
-        #     api_key={'X-API-Key': self.api_key} if self.api_key else {},
-        #     access_token=token
-        # )
-        # 
-        # self.api_client = kmp_supply_chain.ApiClient(configuration)
-        # self.api_instance = default_api.DefaultApi(self.api_client)
-        pass
+        self.jwt_token = token
+        self._token_exp = _jwt_expiry(token)
+        self._headers["Authorization"] = f"Bearer {token}"
+        # self.configuration.access_token = token
+        # if self.api_key:
+        #     self.configuration.api_key['X-API-Key'] = self.api_key
+
+    def _needs_refresh(self) -> bool:
+        """
+        ⏳ Whether the current JWT is missing or about to expire
+        """
+        return time.time() > self._token_exp - _TOKEN_REFRESH_MARGIN
+
+    def _load_token(self) -> bool:
+        """
+        📂 Pick up a saved login for this API if it is still valid
+        
+        Returns:
+            Whether a valid saved token was loaded
+        """
+        try:
+            saved = msgspec.json.decode(_TOKEN_PATH.read_bytes())
+        except (OSError, ValueError):
+            return False
 
+        # A corrupt or foreign file is treated as no saved login
+        if not isinstance(saved, dict) or saved.get("base_url") != self.base_url:
+            return False
+        token = saved.get("token")
+        if not isinstance(token, str) or not token:
+            return False
+        if time.time() > _jwt_expiry(token) - _TOKEN_REFRESH_MARGIN:
+            return False
 
-def main():
+        email = saved.get("email")
+        self._token_email = email if isinstance(email, str) else None
+        self._update_token(token)
+        return True
+
+    def _ensure_token(self):
+        """
+        ⏳ Never send an expired JWT
+        
+        When the current token is (nearly) expired, re-read the saved login,
+        which another run or thread may have refreshed. If that is stale
+        too, the token is dropped so requests fall back to the API key (or
+        go unauthenticated) until login_user() is called again.
+        """
+        if not self.jwt_token or not self._needs_refresh():
+            return
+        if self._load_token():
+            return
+
+        logger.warning("⏳ JWT for %s expired; log in again", self._token_email or "this client")
+        self.jwt_token = None
+        self._token_email = None
+        self._token_exp = 0.0
+        self._headers.pop("Authorization", None)
+        # self.configuration.access_token = None
+
+    def _save_token(self, email: str):
+        """
+        💾 Save the current login (owner-readable only) for later runs
+        """
+        self._token_email = email
+        _TOKEN_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(_TOKEN_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            # The open() mode only applies when the file is created; tighten a
+            # pre-existing file (and directory) before the token goes in
+            os.chmod(_TOKEN_PATH.parent, 0o700)
+            os.chmod(_TOKEN_PATH, 0o600)
+            f.write(_json_encoder.encode({
+                "base_url": self.base_url,
+                "email": email,
+                "token": self.jwt_token
+            }))
+
+
+async def main():
     """
     🚀 Example Usage
     """
-    print("🚀 KMP Supply Chain API - Python SDK Example")
-    print("============================================")
+    logger.info("🚀 KMP Supply Chain API - Python SDK Example")
+    logger.info("============================================")
 
     # Initialize client
-    client = KMPSupplyChainClient(
+    async with KMPSupplyChainClient(
         base_url="http://localhost:4000",
         # You can use either API key or JWT token
         api_key="your-api-key-here"
         # jwt_token="your-jwt-token-here"
-    )
+    ) as client:
+        try:
+            # 1-4. Health check, event submission, product trace and transaction
+            # status don't depend on each other, so run them concurrently
+            logger.info("\n🏥 Checking system health, submitting event, tracing product "
+                        "and checking transaction status...")
+            await asyncio.gather(
+                client.get_system_health(),
+                client.submit_supply_chain_event(
+                    product_id="PYTHON_SDK_EXAMPLE_001",
+                    location="SDK_TESTING_FACILITY",
+                    event_type="QUALITY_CHECK",
+                    batch_id="BATCH_PY_001",
+                    metadata={
+                        "inspector": "Python SDK",
+                        "grade": "PREMIUM",
+                        "automated": True,
+                        "sdk_version": "1.0.0"
+                    }
+                ),
+                client.get_product_trace("PYTHON_SDK_EXAMPLE_001"),
+                client.get_transaction_status("example_transaction_hash_here"),
+            )
 
-    try:
-        # 1. Check system health
-        print("\n🏥 Checking system health...")
-        client.get_system_health()
-
-        # 2. Submit a supply chain event
-        print("\n📦 Submitting supply chain event...")
-        client.submit_supply_chain_event(
-            product_id="PYTHON_SDK_EXAMPLE_001",
-            location="SDK_TESTING_FACILITY",
-            event_type="QUALITY_CHECK",
-            batch_id="BATCH_PY_001",
-            metadata={
-                "inspector": "Python SDK",
-                "grade": "PREMIUM",
-                "automated": True,
-                "sdk_version": "1.0.0"
-            }
-        )
+            # 5. Queue a burst of scans; they are submitted in batches of
+            # batch_size, and whatever remains is flushed explicitly here
+            # (closing the client flushes as well)
+            logger.info("\n📥 Queueing scan events for batched submission...")
+            for i in range(1, 4):
+                await client.queue_supply_chain_event(
+                    product_id=f"PYTHON_SDK_EXAMPLE_{i:03d}",
+                    location="SDK_TESTING_FACILITY",
+                    event_type="SCAN",
+                    batch_id="BATCH_PY_001"
+                )
+            await client.flush()
 
-        # 3. Get product traceability  
-        print("\n🔍 Getting product traceability...")
-        client.get_product_trace("PYTHON_SDK_EXAMPLE_001")
+            # 6. Get company dashboard (requires authentication)
+            # logger.info("\n📊 Getting company dashboard...")
+            # poll_dashboard = client.dashboard_for(1)
+            # await poll_dashboard()
 
-        # 4. Check transaction status (example)
-        print("\n🔍 Checking transaction status...")
-        client.get_transaction_status("example_transaction_hash_here")
+            logger.info("\n✅ Example completed successfully!")
 
-        # 5. Get company dashboard (requires authentication)
-        # print("\n📊 Getting company dashboard...")
-        # client.get_company_dashboard(1)
+        except Exception as error:
+            logger.error("\n❌ Example failed: %s", error)
 
-        print("\n✅ Example completed successfully!")
 
-    except Exception as error:
-        print(f"\n❌ Example failed: {error}")
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[_log_sink])
 
+    # Use the libuv-based event loop when it is installed (not on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
 
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main())
@@ -69,7 +69,7 @@ generate_sdk "typescript-fetch" "kmp-supply-chain-sdk" "npmName=@kmp/supply-chai
 
 # Generate Python SDK
 echo "🐍 Generating Python SDK..."
-generate_sdk "python" "kmp_supply_chain" "packageName=kmp_supply_chain,projectName=kmp-supply-chain,packageVersion=1.0.0,packageUrl=https://github.com/kmp/supply-chain-python-sdk"
+generate_sdk "python" "kmp_supply_chain" "packageName=kmp_supply_chain,library=asyncio,projectName=kmp-supply-chain,packageVersion=1.0.0,packageUrl=https://github.com/kmp/supply-chain-python-sdk"
 
 # Generate Java SDK
 echo "☕ Generating Java SDK..."
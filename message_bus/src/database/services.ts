@@ -1,4 +1,4 @@
-import { eq, desc, and, gte, lte, sql, count, sum, avg } from 'drizzle-orm';
+import { eq, asc, desc, and, gt, gte, lte, sql, count, sum, avg } from 'drizzle-orm';
 import { db } from './connection';
 import { 
   companies, 
@@ -161,17 +161,44 @@ export class EventService {
     return event;
   }
 
-  static async findByProductId(productId: string, companyId?: number): Promise<SupplyChainEvent[]> {
+  // Newest first; with `since`, oldest first so that `limit` returns the
+  // next page after `since` rather than the newest events
+  static async findByProductId(
+    productId: string,
+    companyId?: number,
+    limit?: number,
+    since?: Date
+  ): Promise<SupplyChainEvent[]> {
+    const query = db
+      .select()
+      .from(supplyChainEvents)
+      .where(EventService.productEventsWhere(productId, companyId, since))
+      .orderBy(
+        ...(since
+          ? [asc(supplyChainEvents.eventTimestamp), asc(supplyChainEvents.id)]
+          : [desc(supplyChainEvents.eventTimestamp)])
+      );
+
+    return limit ? query.limit(limit) : query;
+  }
+
+  static async countByProductId(productId: string, companyId?: number, since?: Date): Promise<number> {
+    const [result] = await db
+      .select({ count: count() })
+      .from(supplyChainEvents)
+      .where(EventService.productEventsWhere(productId, companyId, since));
+    return result?.count || 0;
+  }
+
+  private static productEventsWhere(productId: string, companyId?: number, since?: Date) {
     const whereConditions = [eq(supplyChainEvents.productId, productId)];
     if (companyId) {
       whereConditions.push(eq(supplyChainEvents.companyId, companyId));
     }
-
-    return db
-      .select()
-      .from(supplyChainEvents)
-      .where(and(...whereConditions))
-      .orderBy(desc(supplyChainEvents.eventTimestamp));
+    if (since) {
+      whereConditions.push(gt(supplyChainEvents.eventTimestamp, since));
+    }
+    return and(...whereConditions);
   }
 
   static async findByCompany(companyId: number, limit: number = 100): Promise<SupplyChainEvent[]> {
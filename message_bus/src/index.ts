@@ -1138,22 +1138,52 @@ app.get('/api/company/:companyId/dashboard-fast',
 app.get('/api/product/:productId/trace', async (req, res) => {
   try {
     const { productId } = req.params;
-    const events = await EventService.findByProductId(productId);
+    // Optional paging: `limit` caps the page; `since` returns events after it,
+    // oldest first, so a poller can advance `since` to the last event seen
+    const { limit: rawLimit, since: rawSince } = req.query;
+    let limit: number | undefined;
+    if (rawLimit !== undefined) {
+      // Whole integer in 1..1000 (openapi.yaml), not parseInt's lenient prefix parse
+      limit = typeof rawLimit === 'string' && /^\d+$/.test(rawLimit) ? Number(rawLimit) : NaN;
+      if (!(limit >= 1 && limit <= 1000)) {
+        return res.status(400).json({ error: 'Invalid limit: must be an integer between 1 and 1000' });
+      }
+    }
+    let since: Date | undefined;
+    if (rawSince !== undefined) {
+      since = typeof rawSince === 'string' ? new Date(rawSince) : new Date(NaN);
+      if (isNaN(since.getTime())) {
+        return res.status(400).json({ error: 'Invalid since timestamp' });
+      }
+    }
+    const events = await EventService.findByProductId(productId, undefined, limit, since);
+    // All matching events, not just this page; only a full page needs a count
+    const totalEvents = limit !== undefined && events.length === limit
+      ? await EventService.countByProductId(productId, undefined, since)
+      : events.length;
+    const traceEvents = events.map(event => ({
+      id: event.id,
+      eventType: event.eventType,
+      location: event.location,
+      timestamp: event.eventTimestamp,
+      status: event.status,
+      transactionHash: event.transactionHash,
+      isOffChain: event.isOffChain,
+      contentHash: event.contentHash
+    }));
+    
+    // ETag over the trace itself: Express's default one covers the response
+    // timestamp too, so it never matches. With it set, Express answers a
+    // matching If-None-Match with 304
+    const crypto = require('crypto');
+    const traceHash = crypto.createHash('sha1').update(JSON.stringify([totalEvents, traceEvents])).digest('base64url');
+    res.set('ETag', `W/"${traceHash}"`);
     
     res.json({
       success: true,
       productId,
-      totalEvents: events.length,
-      events: events.map(event => ({
-        id: event.id,
-        eventType: event.eventType,
-        location: event.location,
-        timestamp: event.eventTimestamp,
-        status: event.status,
-        transactionHash: event.transactionHash,
-        isOffChain: event.isOffChain,
-        contentHash: event.contentHash
-      })),
+      totalEvents,
+      events: traceEvents,
       timestamp: new Date().toISOString()
     });
   } catch (error) {
@@ -11,27 +11,110 @@ Tests the complete PEA Agent functionality including:
 """
 
 import asyncio
+import functools
 import json
 import os
 import platform
-import subprocess
+import re
+import signal
 import sys
 import tempfile
 import time
-from dataclasses import dataclass
+from collections import namedtuple
+from dataclasses import asdict, dataclass, is_dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Union
 import requests
-import yaml
 import psutil
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@dataclass(slots=True, frozen=True)
 class TestResult:
     name: str
     success: bool
     duration: float
     details: Dict[str, Any]
     error: Optional[str] = None
+    
+    def __post_init__(self):
+        # Results are serialized as-is, so round here to keep the report's
+        # 2 dp durations
+        object.__setattr__(self, "duration", round(self.duration, 2))
+
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode()
+
+def _json_default(obj: Any) -> Any:
+    """Stdlib json fallback for dataclasses (orjson handles them natively)"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Case-insensitive keyword sets, matched in a single pass over raw output
+_QUEUE_KEYWORDS = re.compile(rb"queue|pending|retry", re.IGNORECASE)
+_MOCK_KEYWORD = re.compile(rb"mock", re.IGNORECASE)
+# Status lines describing the agent's keys ("Keys Status", key IDs, ages)
+_KEY_LINES = re.compile(rb"^.*\bkeys?\b.*$", re.IGNORECASE | re.MULTILINE)
+
+CommandResult = namedtuple("CommandResult", "returncode stdout stderr")
+
+async def _read_capped(stream: asyncio.StreamReader, cap: int = 1 << 16) -> bytes:
+    """Read a stream to EOF, keeping at most cap bytes"""
+    buf = bytearray()
+    while chunk := await stream.read(cap):
+        if len(buf) < cap:
+            buf += chunk[:cap - len(buf)]
+    return bytes(buf)
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def _cpu_snapshot(pid: int) -> int:
+    """Return cumulative utime + stime (clock ticks) from /proc/<pid>/stat"""
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        # Fields after the parenthesised comm start at field 3 (state)
+        fields = f.read().rpartition(b")")[2].split()
+    return int(fields[11]) + int(fields[12])
+
+def _memory_snapshot(pid: int) -> tuple:
+    """Return (VmRSS, VmHWM) in MB from /proc/<pid>/status"""
+    rss = peak = 0
+    with open(f"/proc/{pid}/status", "rb") as f:
+        for line in f:
+            if line.startswith(b"VmRSS:"):
+                rss = int(line.split()[1])
+            elif line.startswith(b"VmHWM:"):
+                peak = int(line.split()[1])
+    return rss / 1024, peak / 1024
+
+def _record_test(name: str):
+    """Time a test, wrap its outcome in a TestResult, record and print it
+
+    The test returns its details dict, or (success, details) when passing
+    depends on more than not raising.
+    """
+    def decorator(test):
+        @functools.wraps(test)
+        async def wrapper(self) -> TestResult:
+            start_time = time.perf_counter()
+            try:
+                outcome = await test(self)
+                success, details = outcome if isinstance(outcome, tuple) else (True, outcome)
+                test_result = TestResult(name, success, time.perf_counter() - start_time, details)
+            except Exception as e:
+                test_result = TestResult(name, False, time.perf_counter() - start_time, {}, str(e))
+            
+            self.test_results.append(test_result)
+            self.print_test_result(test_result)
+            return test_result
+        return wrapper
+    return decorator
 
 class PEAAgentE2ETester:
     """End-to-end tester for PEA Agent"""
@@ -41,14 +124,20 @@ class PEAAgentE2ETester:
         self.config_file = config_file
         self.test_results: List[TestResult] = []
         self.temp_dir = tempfile.mkdtemp(prefix="pea_agent_test_")
-        self.agent_process: Optional[subprocess.Popen] = None
+        self.agent_process: Optional[asyncio.subprocess.Process] = None
+        self._status_task: Optional[asyncio.Future] = None
+        # Pre-encoded argv pieces so repeated calls skip os.fsencode
+        self._agent_binary_bytes = os.fsencode(agent_binary)
+        self._status_args: Dict[str, List[bytes]] = {}
+        self._psutil_proc: Optional[psutil.Process] = None
+        self._cpu_primed_at = 0.0
         
     async def run_all_tests(self) -> Dict[str, Any]:
         """Run complete end-to-end test suite"""
         print("🧪 Starting KMP PEA Agent E2E Test Suite")
         print("=" * 60)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Core functionality tests
@@ -56,12 +145,17 @@ class PEAAgentE2ETester:
             await self.test_configuration()
             await self.test_service_management()
             await self.test_key_management()
-            await self.test_scanner_discovery()
+            
+            # Read-only checks against the running agent, run concurrently
+            await asyncio.gather(
+                self.test_scanner_discovery(),
+                self.test_blockchain_submission(),
+                self.test_offline_queue(),
+                self.test_security_features(),
+            )
+            
             await self.test_scan_processing()
-            await self.test_blockchain_submission()
-            await self.test_offline_queue()
             await self.test_monitoring()
-            await self.test_security_features()
             
             # Performance tests
             await self.test_performance()
@@ -74,658 +168,501 @@ class PEAAgentE2ETester:
         finally:
             await self.cleanup()
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         return self.generate_report(total_time)
     
-    async def test_installation(self) -> TestResult:
+    @_record_test("Installation")
+    async def test_installation(self) -> Dict[str, Any]:
         """Test PEA Agent installation and binary verification"""
-        start_time = time.time()
-        
-        try:
-            # Test binary exists and is executable
-            if not os.path.exists(self.agent_binary):
-                raise FileNotFoundError(f"Agent binary not found: {self.agent_binary}")
-            
-            if not os.access(self.agent_binary, os.X_OK):
-                raise PermissionError(f"Agent binary not executable: {self.agent_binary}")
-            
-            # Test version command
-            result = await self.run_agent_command(["--version"])
-            if result.returncode != 0:
-                raise RuntimeError(f"Version command failed: {result.stderr}")
-            
-            version_output = result.stdout.decode().strip()
-            if not version_output:
-                raise RuntimeError("Version command returned empty output")
-            
-            # Test help command
-            result = await self.run_agent_command(["--help"])
-            if result.returncode != 0:
-                raise RuntimeError(f"Help command failed: {result.stderr}")
-            
-            details = {
-                "binary_path": self.agent_binary,
-                "version": version_output,
-                "platform": platform.platform(),
-                "architecture": platform.machine(),
-            }
-            
-            test_result = TestResult(
-                name="Installation",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Installation",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Test binary exists and is executable
+        if not os.path.exists(self.agent_binary):
+            raise FileNotFoundError(f"Agent binary not found: {self.agent_binary}")
+        
+        if not os.access(self.agent_binary, os.X_OK):
+            raise PermissionError(f"Agent binary not executable: {self.agent_binary}")
+        
+        # Test version command
+        result = await self.run_agent_command(["--version"])
+        if result.returncode != 0:
+            raise RuntimeError(f"Version command failed: {result.stderr}")
+        
+        version_output = result.stdout.decode().strip()
+        if not version_output:
+            raise RuntimeError("Version command returned empty output")
+        
+        # Test help command
+        result = await self.run_agent_command(["--help"])
+        if result.returncode != 0:
+            raise RuntimeError(f"Help command failed: {result.stderr}")
+        
+        details = {
+            "binary_path": self.agent_binary,
+            "version": version_output,
+            "platform": platform.platform(),
+            "architecture": platform.machine(),
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_configuration(self) -> TestResult:
+    @_record_test("Configuration")
+    async def test_configuration(self) -> Dict[str, Any]:
         """Test configuration management"""
-        start_time = time.time()
-        
-        try:
-            # Create test configuration
-            test_config = {
-                "kaspa": {
-                    "rpc_endpoints": ["grpc://localhost:16210"],
-                    "fee_rate": "1000",
-                    "max_fee": "10000000",
-                    "timeout_seconds": 30
-                },
-                "scanners": {
-                    "auto_discovery": True,
-                    "enabled_types": ["mock"],
-                    "discovery_interval_seconds": 5
-                },
-                "logging": {
-                    "level": "debug",
-                    "audit_enabled": True
-                },
-                "monitoring": {
-                    "heartbeat_interval_hours": 1,
-                    "anomaly_detection": True
-                }
-            }
-            
-            config_path = os.path.join(self.temp_dir, "test-config.yaml")
-            with open(config_path, 'w') as f:
-                yaml.dump(test_config, f)
-            
-            self.config_file = config_path
-            
-            # Test config validation
-            result = await self.run_agent_command(["config", "--validate", "--config", config_path])
-            if result.returncode != 0:
-                raise RuntimeError(f"Config validation failed: {result.stderr}")
-            
-            # Test config display
-            result = await self.run_agent_command(["config", "--config", config_path])
-            if result.returncode != 0:
-                raise RuntimeError(f"Config display failed: {result.stderr}")
-            
-            details = {
-                "config_path": config_path,
-                "config_valid": True,
-                "config_size": os.path.getsize(config_path)
+        # Create test configuration
+        test_config = {
+            "kaspa": {
+                "rpc_endpoints": ["grpc://localhost:16210"],
+                "fee_rate": "1000",
+                "max_fee": "10000000",
+                "timeout_seconds": 30
+            },
+            "scanners": {
+                "auto_discovery": True,
+                "enabled_types": ["mock"],
+                "discovery_interval_seconds": 5
+            },
+            "logging": {
+                "level": "debug",
+                "audit_enabled": True
+            },
+            "monitoring": {
+                "heartbeat_interval_hours": 1,
+                "anomaly_detection": True
             }
-            
-            test_result = TestResult(
-                name="Configuration",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Configuration",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        }
+        
+        config_path = os.path.join(self.temp_dir, "test-config.json")
+        with open(config_path, 'w') as f:
+            json.dump(test_config, f)
+        
+        self.config_file = config_path
+        
+        # Test config validation and display (both read-only, run together)
+        validate_result, display_result = await asyncio.gather(
+            self.run_agent_command(["config", "--validate", "--config", config_path]),
+            self.run_agent_command(["config", "--config", config_path]),
+        )
+        if validate_result.returncode != 0:
+            raise RuntimeError(f"Config validation failed: {validate_result.stderr}")
+        
+        if display_result.returncode != 0:
+            raise RuntimeError(f"Config display failed: {display_result.stderr}")
+        
+        details = {
+            "config_path": config_path,
+            "config_valid": True,
+            "config_size": os.path.getsize(config_path)
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_service_management(self) -> TestResult:
+    @_record_test("Service Management")
+    async def test_service_management(self) -> Dict[str, Any]:
         """Test service start/stop/status functionality"""
-        start_time = time.time()
+        # Start the agent service
+        start_cmd = ["start", "--config", self.config_file]
+        self.agent_process = await self.start_agent_service(start_cmd)
         
-        try:
-            # Start the agent service
-            start_cmd = ["start", "--config", self.config_file]
-            self.agent_process = await self.start_agent_service(start_cmd)
-            
-            # Wait for service to start
-            await asyncio.sleep(3)
-            
-            # Check if process is running
-            if not self.agent_process or self.agent_process.poll() is not None:
-                raise RuntimeError("Agent process failed to start or exited early")
-            
-            # Test status command
-            result = await self.run_agent_command(["status", "--config", self.config_file])
-            if result.returncode != 0:
-                raise RuntimeError(f"Status command failed: {result.stderr}")
-            
-            status_output = result.stdout.decode()
-            if "Running" not in status_output:
-                raise RuntimeError(f"Agent not showing as running: {status_output}")
-            
-            # Test process is consuming reasonable resources
-            process = psutil.Process(self.agent_process.pid)
-            cpu_percent = process.cpu_percent(interval=1)
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            
-            if memory_mb > 256:  # More than 256MB is concerning
-                raise RuntimeError(f"Agent using too much memory: {memory_mb:.1f}MB")
-            
-            details = {
-                "pid": self.agent_process.pid,
-                "cpu_percent": cpu_percent,
-                "memory_mb": round(memory_mb, 1),
-                "status": "running"
-            }
-            
-            test_result = TestResult(
-                name="Service Management",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Service Management",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Wait for service to start
+        await self.wait_ready()
+        
+        # Check if process is running
+        if not self.agent_process or self.agent_process.returncode is not None:
+            raise RuntimeError("Agent process failed to start or exited early")
+        
+        # Test status command
+        result = await self.agent_status()
+        if result.returncode != 0:
+            raise RuntimeError(f"Status command failed: {result.stderr}")
+        
+        if b"Running" not in result.stdout:
+            raise RuntimeError(f"Agent not showing as running: {result.stdout.decode()}")
+        
+        # Test process is consuming reasonable resources
+        cpu_percent, memory_mb = await self.sample_agent_usage()
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        if memory_mb > 256:  # More than 256MB is concerning
+            raise RuntimeError(f"Agent using too much memory: {memory_mb:.1f}MB")
+        
+        details = {
+            "pid": self.agent_process.pid,
+            "cpu_percent": cpu_percent,
+            "memory_mb": round(memory_mb, 1),
+            "status": "running"
+        }
+        
+        return details
     
-    async def test_key_management(self) -> TestResult:
+    @_record_test("Key Management")
+    async def test_key_management(self) -> Dict[str, Any]:
         """Test cryptographic key management"""
-        start_time = time.time()
-        
-        try:
-            # Wait for agent to initialize keys
-            await asyncio.sleep(2)
-            
-            # Check key status
-            result = await self.run_agent_command(["status", "--config", self.config_file])
-            status_output = result.stdout.decode()
-            
-            if "Keys Status" not in status_output:
-                raise RuntimeError("Key status not found in output")
-            
-            # Test key rotation
-            result = await self.run_agent_command(["rotate-keys", "--config", self.config_file])
-            if result.returncode != 0:
-                raise RuntimeError(f"Key rotation failed: {result.stderr}")
-            
-            # Verify keys rotated
-            await asyncio.sleep(1)
-            result = await self.run_agent_command(["status", "--config", self.config_file])
-            new_status = result.stdout.decode()
-            
-            details = {
-                "key_rotation_success": True,
-                "key_status_available": True
-            }
-            
-            test_result = TestResult(
-                name="Key Management",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Key Management",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Wait for agent to initialize keys
+        await self.wait_ready(b"Keys Status")
+        
+        # Check key status
+        result = await self.agent_status()
+        if b"Keys Status" not in result.stdout:
+            raise RuntimeError("Key status not found in output")
+        keys_before = _KEY_LINES.findall(result.stdout)
+        
+        # Test key rotation
+        result = await self.run_agent_command(["rotate-keys", "--config", self.config_file])
+        if result.returncode != 0:
+            raise RuntimeError(f"Key rotation failed: {result.stderr}")
+        
+        # Verify keys rotated: the reported key details must change
+        def rotated(stdout: bytes) -> bool:
+            keys_after = _KEY_LINES.findall(stdout)
+            return bool(keys_after) and keys_after != keys_before
+        
+        if not await self.wait_ready(rotated):
+            raise RuntimeError("Key status unchanged after rotation")
+        
+        details = {
+            "key_rotation_success": True,
+            "key_status_available": True
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_scanner_discovery(self) -> TestResult:
+    @_record_test("Scanner Discovery")
+    async def test_scanner_discovery(self) -> Dict[str, Any]:
         """Test scanner auto-discovery functionality"""
-        start_time = time.time()
+        # Test scanner discovery
+        result = await self.run_agent_command(["test-scanners", "--config", self.config_file])
+        if result.returncode != 0:
+            raise RuntimeError(f"Scanner test failed: {result.stderr}")
         
-        try:
-            # Test scanner discovery
-            result = await self.run_agent_command(["test-scanners", "--config", self.config_file])
-            if result.returncode != 0:
-                raise RuntimeError(f"Scanner test failed: {result.stderr}")
-            
-            scanner_output = result.stdout.decode()
-            
-            # For testing, we expect at least mock scanners to be found
-            if "Found" not in scanner_output and "mock" not in scanner_output.lower():
-                print(f"⚠️  No scanners found (expected in test environment)")
-            
-            details = {
-                "scanner_discovery_ran": True,
-                "output_length": len(scanner_output)
-            }
-            
-            test_result = TestResult(
-                name="Scanner Discovery",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Scanner Discovery",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        scanner_output = result.stdout
+        
+        # For testing, we expect at least mock scanners to be found
+        if b"Found" not in scanner_output and not _MOCK_KEYWORD.search(scanner_output):
+            print(f"⚠️  No scanners found (expected in test environment)")
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        details = {
+            "scanner_discovery_ran": True,
+            "output_length": len(scanner_output)
+        }
+        
+        return details
     
-    async def test_scan_processing(self) -> TestResult:
+    @_record_test("Scan Processing")
+    async def test_scan_processing(self) -> Dict[str, Any]:
         """Test scan event processing"""
-        start_time = time.time()
-        
-        try:
-            # Create a mock scan event file
-            scan_event = {
-                "product_id": "E2E-TEST-123456789",
-                "event_type": "SCAN",
-                "scanner_id": "e2e-test-scanner",
-                "metadata": {
-                    "test": "e2e_scan_processing",
-                    "timestamp": time.time()
-                }
-            }
-            
-            scan_file = os.path.join(self.temp_dir, "test-scan.json")
-            with open(scan_file, 'w') as f:
-                json.dump(scan_event, f)
-            
-            # Process the scan event (if agent supports file input)
-            # For now, we'll just verify the agent can handle scan events
-            # by checking the logs or status
-            
-            await asyncio.sleep(2)  # Allow time for any background processing
-            
-            # Check agent status for scan processing capabilities
-            result = await self.run_agent_command(["status", "--config", self.config_file])
-            status_output = result.stdout.decode()
-            
-            details = {
-                "scan_event_created": True,
-                "scan_file_size": os.path.getsize(scan_file),
-                "product_id": scan_event["product_id"]
+        # Create a mock scan event file
+        scan_event = {
+            "product_id": "E2E-TEST-123456789",
+            "event_type": "SCAN",
+            "scanner_id": "e2e-test-scanner",
+            "metadata": {
+                "test": "e2e_scan_processing",
+                "timestamp": time.time()
             }
-            
-            test_result = TestResult(
-                name="Scan Processing",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Scan Processing",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        }
+        
+        scan_file = os.path.join(self.temp_dir, "test-scan.json")
+        with open(scan_file, 'wb') as f:
+            f.write(dump_json(scan_event))
+        
+        # Process the scan event (if agent supports file input)
+        # For now, we'll just verify the agent can handle scan events
+        # by checking the logs or status
+        
+        # Check agent status for scan processing capabilities
+        await self.wait_ready()
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        details = {
+            "scan_event_created": True,
+            "scan_file_size": os.path.getsize(scan_file),
+            "product_id": scan_event["product_id"]
+        }
+        
+        return details
     
-    async def test_blockchain_submission(self) -> TestResult:
+    @_record_test("Blockchain Submission")
+    async def test_blockchain_submission(self) -> Dict[str, Any]:
         """Test blockchain transaction submission"""
-        start_time = time.time()
-        
-        try:
-            # This test depends on having a Kaspa node available
-            # For E2E testing, we'll check if the agent can connect
-            
-            # Check agent connectivity
-            result = await self.run_agent_command(["diagnose", "--network", "--config", self.config_file])
-            
-            # Even if it fails to connect (expected in test environment),
-            # we want to verify the command works
-            diagnose_output = result.stdout.decode() if result.stdout else ""
-            error_output = result.stderr.decode() if result.stderr else ""
-            
-            details = {
-                "diagnose_command_ran": True,
-                "output_length": len(diagnose_output + error_output),
-                "connection_attempted": True
-            }
-            
-            # In a real test environment with Kaspa node, we'd test actual submission
-            # For now, we'll consider it successful if the command executed
-            test_result = TestResult(
-                name="Blockchain Submission",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Blockchain Submission",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # This test depends on having a Kaspa node available
+        # For E2E testing, we'll check if the agent can connect
+        
+        # Check agent connectivity
+        result = await self.run_agent_command(["diagnose", "--network", "--config", self.config_file])
+        
+        # Even if it fails to connect (expected in test environment),
+        # we want to verify the command works
+        details = {
+            "diagnose_command_ran": True,
+            "output_length": len(result.stdout or b"") + len(result.stderr or b""),
+            "connection_attempted": True
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        # In a real test environment with Kaspa node, we'd test actual submission
+        # For now, we'll consider it successful if the command executed
+        return details
     
-    async def test_offline_queue(self) -> TestResult:
+    @_record_test("Offline Queue")
+    async def test_offline_queue(self) -> Dict[str, Any]:
         """Test offline queue functionality"""
-        start_time = time.time()
+        # Check if queue status is available
+        result = await self.agent_status()
+        status_output = result.stdout
         
-        try:
-            # Check if queue status is available
-            result = await self.run_agent_command(["status", "--config", self.config_file])
-            status_output = result.stdout.decode()
-            
-            # Look for queue-related information in status
-            has_queue_info = any(word in status_output.lower() for word in ["queue", "pending", "retry"])
-            
-            details = {
-                "queue_status_available": has_queue_info,
-                "status_output_length": len(status_output)
-            }
-            
-            test_result = TestResult(
-                name="Offline Queue",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Offline Queue",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Look for queue-related information in status
+        has_queue_info = _QUEUE_KEYWORDS.search(status_output) is not None
+        
+        details = {
+            "queue_status_available": has_queue_info,
+            "status_output_length": len(status_output)
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_monitoring(self) -> TestResult:
+    @_record_test("Monitoring")
+    async def test_monitoring(self) -> Dict[str, Any]:
         """Test monitoring and heartbeat functionality"""
-        start_time = time.time()
+        # Test that monitoring features don't crash the agent
+        await asyncio.sleep(3)  # Let agent run for a bit
         
-        try:
-            # Test that monitoring features don't crash the agent
-            await asyncio.sleep(3)  # Let agent run for a bit
-            
-            # Check if agent is still running
-            if not self.agent_process or self.agent_process.poll() is not None:
-                raise RuntimeError("Agent process died during monitoring test")
-            
-            # Get process metrics
-            process = psutil.Process(self.agent_process.pid)
-            cpu_percent = process.cpu_percent(interval=1)
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            
-            details = {
-                "agent_running": True,
-                "cpu_percent": cpu_percent,
-                "memory_mb": round(memory_mb, 1),
-                "monitoring_stable": True
-            }
-            
-            test_result = TestResult(
-                name="Monitoring",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Monitoring",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Check if agent is still running
+        if not self.agent_process or self.agent_process.returncode is not None:
+            raise RuntimeError("Agent process died during monitoring test")
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        # Get process metrics (CPU averaged since the previous sample)
+        cpu_percent, memory_mb = await self.sample_agent_usage()
+        
+        details = {
+            "agent_running": True,
+            "cpu_percent": cpu_percent,
+            "memory_mb": round(memory_mb, 1),
+            "monitoring_stable": True
+        }
+        
+        return details
     
-    async def test_security_features(self) -> TestResult:
+    @_record_test("Security Features")
+    async def test_security_features(self) -> Dict[str, Any]:
         """Test security hardening features"""
-        start_time = time.time()
-        
-        try:
-            # Test security audit command
-            result = await self.run_agent_command(["verify", "--security", "--config", self.config_file])
-            
-            # Command should execute even if some security features aren't available
-            verify_output = result.stdout.decode() if result.stdout else ""
-            error_output = result.stderr.decode() if result.stderr else ""
-            
-            # Check if agent process is running with reasonable privileges
-            if self.agent_process:
-                process = psutil.Process(self.agent_process.pid)
-                # On Unix systems, check if not running as root
-                if hasattr(process, 'uids') and process.uids().real == 0:
-                    print("⚠️  Agent running as root (not recommended for production)")
-            
-            details = {
-                "verify_command_ran": True,
-                "output_length": len(verify_output + error_output),
-                "security_check_attempted": True
-            }
-            
-            test_result = TestResult(
-                name="Security Features",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Security Features",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Test security audit command
+        result = await self.run_agent_command(["verify", "--security", "--config", self.config_file])
+        
+        # Command should execute even if some security features aren't available
+        
+        # Check if agent process is running with reasonable privileges
+        if self._psutil_proc:
+            process = self._psutil_proc
+            # On Unix systems, check if not running as root
+            if hasattr(process, 'uids') and process.uids().real == 0:
+                print("⚠️  Agent running as root (not recommended for production)")
+        
+        details = {
+            "verify_command_ran": True,
+            "output_length": len(result.stdout or b"") + len(result.stderr or b""),
+            "security_check_attempted": True
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_performance(self) -> TestResult:
+    @_record_test("Performance")
+    async def test_performance(self) -> Dict[str, Any]:
         """Test performance characteristics"""
-        start_time = time.time()
+        if not self.agent_process:
+            raise RuntimeError("Agent process not running for performance test")
         
-        try:
-            if not self.agent_process:
-                raise RuntimeError("Agent process not running for performance test")
-            
-            # Monitor performance for a few seconds
-            process = psutil.Process(self.agent_process.pid)
-            
-            cpu_samples = []
-            memory_samples = []
-            
-            for _ in range(5):
-                cpu_samples.append(process.cpu_percent(interval=1))
-                memory_samples.append(process.memory_info().rss / 1024 / 1024)
-                await asyncio.sleep(1)
-            
-            avg_cpu = sum(cpu_samples) / len(cpu_samples)
-            avg_memory = sum(memory_samples) / len(memory_samples)
-            max_memory = max(memory_samples)
-            
-            # Performance assertions
-            if avg_cpu > 50:  # More than 50% CPU average is concerning
-                raise RuntimeError(f"High CPU usage: {avg_cpu:.1f}%")
-            
-            if max_memory > 512:  # More than 512MB is concerning
-                raise RuntimeError(f"High memory usage: {max_memory:.1f}MB")
-            
-            details = {
-                "avg_cpu_percent": round(avg_cpu, 1),
-                "avg_memory_mb": round(avg_memory, 1),
-                "max_memory_mb": round(max_memory, 1),
-                "samples": len(cpu_samples),
-                "performance_acceptable": True
-            }
-            
-            test_result = TestResult(
-                name="Performance",
-                success=True,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Performance",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+        # Monitor performance for a few seconds
+        usage = await self.measure_process_usage(self.agent_process.pid, window=5.0)
+        
+        avg_cpu = usage["cpu_percent"]
+        avg_memory = usage["avg_memory_mb"]
+        max_memory = usage["max_memory_mb"]
+        
+        # Performance assertions
+        if avg_cpu > 50:  # More than 50% CPU average is concerning
+            raise RuntimeError(f"High CPU usage: {avg_cpu:.1f}%")
+        
+        if max_memory > 512:  # More than 512MB is concerning
+            raise RuntimeError(f"High memory usage: {max_memory:.1f}MB")
+        
+        details = {
+            "avg_cpu_percent": round(avg_cpu, 1),
+            "avg_memory_mb": round(avg_memory, 1),
+            "max_memory_mb": round(max_memory, 1),
+            "window_seconds": 5.0,
+            "performance_acceptable": True
+        }
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        return details
     
-    async def test_failure_recovery(self) -> TestResult:
+    @_record_test("Failure Recovery")
+    async def test_failure_recovery(self) -> Dict[str, Any]:
         """Test failure scenarios and recovery"""
-        start_time = time.time()
-        
-        try:
-            # Test graceful shutdown
-            if self.agent_process:
-                # Send SIGTERM (graceful shutdown)
-                self.agent_process.terminate()
+        # Test graceful shutdown
+        graceful_shutdown = False
+        if self.agent_process and self.agent_process.returncode is None:
+            try:
+                # Send SIGTERM (graceful shutdown) to the agent and anything it spawned
+                self.signal_agent_group()
                 
                 # Wait for graceful shutdown
+                await asyncio.wait_for(self.wait_for_process_exit(), timeout=10)
+                graceful_shutdown = True
+            except ProcessLookupError:
+                pass  # Exited on its own before we signalled it
+            except asyncio.TimeoutError:
+                # Force kill if graceful shutdown failed
                 try:
-                    await asyncio.wait_for(self.wait_for_process_exit(), timeout=10)
-                    graceful_shutdown = True
-                except asyncio.TimeoutError:
-                    # Force kill if graceful shutdown failed
-                    self.agent_process.kill()
-                    graceful_shutdown = False
-            
-            # Test restart capability
-            start_cmd = ["start", "--config", self.config_file]
-            self.agent_process = await self.start_agent_service(start_cmd)
-            
-            await asyncio.sleep(2)  # Allow restart
-            
-            restart_success = (self.agent_process and 
-                             self.agent_process.poll() is None)
-            
-            details = {
-                "graceful_shutdown": graceful_shutdown,
-                "restart_success": restart_success,
-                "recovery_tested": True
-            }
-            
-            test_result = TestResult(
-                name="Failure Recovery",
-                success=restart_success,
-                duration=time.time() - start_time,
-                details=details
-            )
-            
-        except Exception as e:
-            test_result = TestResult(
-                name="Failure Recovery",
-                success=False,
-                duration=time.time() - start_time,
-                details={},
-                error=str(e)
-            )
+                    self.signal_agent_group(force=True)
+                except ProcessLookupError:
+                    pass
+                await self.agent_process.wait()
+        
+        # Test restart capability
+        start_cmd = ["start", "--config", self.config_file]
+        self.agent_process = await self.start_agent_service(start_cmd)
+        
+        await self.wait_ready()  # Allow restart
+        
+        restart_success = (self.agent_process and 
+                         self.agent_process.returncode is None)
         
-        self.test_results.append(test_result)
-        self.print_test_result(test_result)
-        return test_result
+        details = {
+            "graceful_shutdown": graceful_shutdown,
+            "restart_success": restart_success,
+            "recovery_tested": True
+        }
+        
+        return restart_success, details
     
-    async def run_agent_command(self, args: List[str]) -> subprocess.CompletedProcess:
+    async def run_agent_command(self, args: List[Union[str, bytes]]) -> CommandResult:
         """Run agent command and return result"""
-        cmd = [self.agent_binary] + args
-        
+        # close_fds=False (fds are non-inheritable anyway) lets CPython use posix_spawn
         process = await asyncio.create_subprocess_exec(
-            *cmd,
+            self._agent_binary_bytes,
+            *args,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            close_fds=False
         )
         
-        stdout, stderr = await process.communicate()
-        
-        return subprocess.CompletedProcess(
-            args=cmd,
-            returncode=process.returncode,
-            stdout=stdout,
-            stderr=stderr
+        # Agent output is small; drain both pipes into bounded buffers
+        stdout, stderr = await asyncio.gather(
+            _read_capped(process.stdout),
+            _read_capped(process.stderr),
         )
+        await process.wait()
+        
+        return CommandResult(process.returncode, stdout, stderr)
+    
+    async def agent_status(self) -> CommandResult:
+        """Query agent status, sharing one subprocess between concurrent callers"""
+        if self._status_task is None or self._status_task.done():
+            args = self._status_args.get(self.config_file)
+            if args is None:
+                args = [b"status", b"--config", os.fsencode(self.config_file)]
+                self._status_args[self.config_file] = args
+            self._status_task = asyncio.ensure_future(self.run_agent_command(args))
+        return await asyncio.shield(self._status_task)
     
-    async def start_agent_service(self, args: List[str]) -> subprocess.Popen:
+    async def start_agent_service(self, args: List[str]) -> asyncio.subprocess.Process:
         """Start agent as background service"""
-        cmd = [self.agent_binary] + args
-        
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            preexec_fn=os.setsid if os.name != 'nt' else None
-        )
+        # Nothing reads the service's output while it runs, and an unread pipe
+        # would block a chatty agent, so append it to a log file instead. The
+        # child keeps its own copy of the descriptor once spawned
+        with open(os.path.join(self.temp_dir, "agent.log"), "ab") as log:
+            process = await asyncio.create_subprocess_exec(
+                self.agent_binary,
+                *args,
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True
+            )
         
+        # One psutil handle per agent process (rebound on every restart);
+        # prime its CPU counter so the first sample has a baseline
+        try:
+            self._psutil_proc = psutil.Process(process.pid)
+            self._psutil_proc.cpu_percent(None)
+        except psutil.NoSuchProcess:
+            self._psutil_proc = None
+        self._cpu_primed_at = time.monotonic()
         return process
     
+    async def sample_agent_usage(self, min_interval: float = 1.0) -> tuple:
+        """Return (cpu_percent, rss_mb) of the agent, CPU averaged over at least min_interval"""
+        if self._psutil_proc is None:
+            raise RuntimeError("Agent process is not running")
+        
+        # Too short a window makes the CPU figure noise; top it up without blocking
+        remaining = self._cpu_primed_at + min_interval - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        
+        with self._psutil_proc.oneshot():
+            cpu_percent = self._psutil_proc.cpu_percent(None)
+            memory_mb = self._psutil_proc.memory_info().rss / 1024 / 1024
+        self._cpu_primed_at = time.monotonic()
+        return cpu_percent, memory_mb
+    
+    async def measure_process_usage(self, pid: int, window: float = 5.0) -> Dict[str, float]:
+        """Measure a process's CPU percent over a window from its cumulative counters"""
+        if not os.path.exists(f"/proc/{pid}/stat"):
+            # No procfs (macOS/Windows): non-blocking psutil delta over the window
+            process = psutil.Process(pid)
+            process.cpu_percent(None)
+            rss_start = process.memory_info().rss / 1024 / 1024
+            await asyncio.sleep(window)
+            with process.oneshot():
+                cpu_percent = process.cpu_percent(None)
+                rss_end = process.memory_info().rss / 1024 / 1024
+            return {"cpu_percent": cpu_percent, "avg_memory_mb": (rss_start + rss_end) / 2,
+                    "max_memory_mb": max(rss_start, rss_end)}
+        
+        ticks_start, wall_start = _cpu_snapshot(pid), time.perf_counter()
+        rss_start, _ = _memory_snapshot(pid)
+        await asyncio.sleep(window)
+        ticks_end, wall_end = _cpu_snapshot(pid), time.perf_counter()
+        rss_end, peak = _memory_snapshot(pid)
+        
+        return {
+            "cpu_percent": (ticks_end - ticks_start) / _CLK_TCK / (wall_end - wall_start) * 100,
+            "avg_memory_mb": (rss_start + rss_end) / 2,
+            "max_memory_mb": peak,
+        }
+    
+    async def wait_ready(self, probe: Union[bytes, Callable[[bytes], bool]] = b"Running",
+                         timeout: float = 5) -> bool:
+        """Poll agent status with exponential backoff until probe appears (or returns True for the output)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        
+        while True:
+            if self.agent_process and self.agent_process.returncode is not None:
+                return False
+            
+            result = await self.agent_status()
+            if probe(result.stdout) if callable(probe) else probe in result.stdout:
+                return True
+            
+            if loop.time() + delay > deadline:
+                return False
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.4)
+    
+    def signal_agent_group(self, force: bool = False):
+        """Terminate (or kill) the agent along with any processes it spawned"""
+        if os.name == 'nt':
+            if force:
+                self.agent_process.kill()
+            else:
+                self.agent_process.terminate()
+        else:
+            # start_new_session makes the agent its group leader, so pgid == pid
+            os.killpg(self.agent_process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    
     async def wait_for_process_exit(self):
         """Wait for agent process to exit"""
         if self.agent_process:
-            while self.agent_process.poll() is None:
-                await asyncio.sleep(0.1)
+            await self.agent_process.wait()
     
     def print_test_result(self, result: TestResult):
         """Print formatted test result"""
@@ -755,16 +692,7 @@ class PEAAgentE2ETester:
                 "success_rate": round(success_rate, 1),
                 "total_time": round(total_time, 2)
             },
-            "test_results": [
-                {
-                    "name": r.name,
-                    "success": r.success,
-                    "duration": round(r.duration, 2),
-                    "details": r.details,
-                    "error": r.error
-                }
-                for r in self.test_results
-            ],
+            "test_results": self.test_results,
             "environment": {
                 "platform": platform.platform(),
                 "python_version": sys.version,
@@ -792,18 +720,26 @@ class PEAAgentE2ETester:
     
     async def cleanup(self):
         """Cleanup test resources"""
-        # Stop agent process
-        if self.agent_process and self.agent_process.poll() is None:
+        import shutil
+        
+        # Stop agent process first: it keeps agent.log open and reads its
+        # config from the temp directory until it exits
+        if self.agent_process and self.agent_process.returncode is None:
             try:
-                self.agent_process.terminate()
+                self.signal_agent_group()
                 await asyncio.wait_for(self.wait_for_process_exit(), timeout=5)
             except asyncio.TimeoutError:
-                self.agent_process.kill()
-        
-        # Cleanup temp directory
-        import shutil
+                try:
+                    self.signal_agent_group(force=True)
+                except ProcessLookupError:
+                    pass
+                await self.agent_process.wait()
+            except ProcessLookupError:
+                pass  # Exited before we got to it
+        
+        # Cleanup temp directory in a worker thread
         try:
-            shutil.rmtree(self.temp_dir)
+            await asyncio.get_running_loop().run_in_executor(None, shutil.rmtree, self.temp_dir)
         except Exception as e:
             print(f"⚠️  Failed to cleanup temp directory: {e}")
 
@@ -827,8 +763,8 @@ async def main():
     
     # Save report if requested
     if args.output:
-        with open(args.output, 'w') as f:
-            json.dump(report, f, indent=2)
+        with open(args.output, 'wb') as f:
+            f.write(dump_json(report, indent=True))
         print(f"📄 Report saved to: {args.output}")
     
     # Exit with appropriate code
@@ -836,4 +772,10 @@ async def main():
     sys.exit(0 if success_rate == 100 else 1)
 
 if __name__ == "__main__":
+    # io_uring-backed event loop on Linux when available
+    try:
+        import uringcore
+        asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+    except ImportError:
+        pass
     asyncio.run(main()) 
\ No newline at end of file